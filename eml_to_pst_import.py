@@ -5,6 +5,7 @@
 #   - max PST size limit (e.g., 15–20 GB) -> auto-rotate to part2, part3...
 #   - periodic flush (detach/reattach PST) so Explorer shows file growth
 #   - live folder item counts for progress validation
+#   - parallel .eml parsing in worker processes; only the main thread talks COM
 #
 # WHY this version works (Drafts fix):
 #   We create each MailItem **directly in the PST target folder** using
@@ -51,12 +52,14 @@
 #     (e.g., by year/month) or to a specific folder for a single batch.
 # -----------------------------------------------------------------------------
 
-import os, sys, time, argparse, mimetypes
+import os, re, sys, time, argparse, copy, gc, mimetypes, mmap, queue, shutil, subprocess, threading
+from concurrent.futures import ProcessPoolExecutor
 from email import policy
-from email.parser import BytesParser
+from email.parser import BytesParser, BytesFeedParser, BytesHeaderParser
 from email.utils import parsedate_to_datetime, getaddresses
 
 try:
+    import pythoncom
     import win32com.client as win32
 except Exception:
     print("Error: pywin32 is not installed. Run:  pip install pywin32", file=sys.stderr)
@@ -65,6 +68,9 @@ except Exception:
 # --- MAPI named property tags we set for best fidelity -----------------------
 PR_TRANSPORT_MESSAGE_HEADERS_A = "http://schemas.microsoft.com/mapi/proptag/0x007D001E"
 PR_TRANSPORT_MESSAGE_HEADERS_W = "http://schemas.microsoft.com/mapi/proptag/0x007D001F"
+PR_SUBJECT_W                   = "http://schemas.microsoft.com/mapi/proptag/0x0037001F"
+PR_BODY_W                      = "http://schemas.microsoft.com/mapi/proptag/0x1000001F"
+PR_BODY_HTML_W                 = "http://schemas.microsoft.com/mapi/proptag/0x1013001F"
 PR_MESSAGE_DELIVERY_TIME       = "http://schemas.microsoft.com/mapi/proptag/0x0E060040"
 PR_CLIENT_SUBMIT_TIME          = "http://schemas.microsoft.com/mapi/proptag/0x00390040"
 PR_INTERNET_MESSAGE_ID         = "http://schemas.microsoft.com/mapi/proptag/0x1035001E"
@@ -75,6 +81,15 @@ PR_SENT_REPRESENTING_NAME      = "http://schemas.microsoft.com/mapi/proptag/0x00
 PR_SENT_REPRESENTING_EMAIL     = "http://schemas.microsoft.com/mapi/proptag/0x0065001E"
 PR_ATTACH_CONTENT_ID           = "http://schemas.microsoft.com/mapi/proptag/0x3712001E"
 PR_ATTACH_FLAGS                = "http://schemas.microsoft.com/mapi/proptag/0x37140003"
+PR_ATTACH_LONG_FILENAME_W      = "http://schemas.microsoft.com/mapi/proptag/0x3707001F"
+PR_ATTACH_EXTENSION_W          = "http://schemas.microsoft.com/mapi/proptag/0x3703001F"
+PR_ATTACH_FILENAME_W           = "http://schemas.microsoft.com/mapi/proptag/0x3704001F"
+
+# Outlook object library (9.6 = Outlook 2016+); used to pre-generate early-bound wrappers
+OUTLOOK_TYPELIB = ("{00062FFF-0000-0000-C000-000000000046}", 0, 9, 6)
+OL_MAIL_ITEM    = 0  # replaced by win32.constants.olMailItem once early binding is up
+COM_CLEANUP_EVERY = 10000  # items between pythoncom.CoFreeUnusedLibraries() calls
+PARSE_WINDOW_BYTES = 256 * 1024 * 1024  # .eml bytes per parse window (two windows in flight)
 
 def set_prop(pa, tag, value):
     """Safely set a MAPI property; swallow COM-specific errors."""
@@ -84,6 +99,20 @@ def set_prop(pa, tag, value):
     except Exception:
         return False
 
+def set_props(pa, tags, values):
+    """
+    Set several MAPI properties in one PropertyAccessor.SetProperties call.
+    Return the tags that failed; if the batch call itself raises, fall back
+    to per-property set_prop().
+    """
+    if not tags:
+        return []
+    try:
+        errors = pa.SetProperties(tags, values)
+    except Exception:
+        return [t for t, v in zip(tags, values) if not set_prop(pa, t, v)]
+    return [t for t, err in zip(tags, errors or ()) if err]
+
 def addresses_to_str(value):
     """Normalize RFC822 addresses into Outlook-friendly 'Name <addr>; ...' string."""
     if not value:
@@ -100,159 +129,443 @@ def addresses_to_str(value):
             parts.append(name)
     return "; ".join(parts)
 
-def pick_body(msg):
-    """Pick HTML if available; otherwise text/plain; ignore attachment bodies."""
+def _part_text(part):
+    """Decoded text of a MIME part (None if undecodable)."""
+    try:
+        return part.get_content()
+    except Exception:
+        try:
+            return part.get_payload(decode=True).decode(part.get_content_charset() or "utf-8", errors="ignore")
+        except Exception:
+            return None
+
+def _is_attachment(part, disp):
+    return "attachment" in disp or (part.get_filename() and part.get_content_maintype() != "text")
+
+CID_REF_RE = re.compile(r"""cid:([^"')\s>]+)""", re.IGNORECASE)
+
+def walk_mime_once(msg):
+    """
+    Single MIME traversal returning (html, text, [(filename, payload_bytes, content_id)]).
+    Body: HTML if available, otherwise text/plain; attachment bodies are ignored.
+    """
     html = None
     text = None
-    if msg.is_multipart():
-        for part in msg.walk():
-            ctype = part.get_content_type()
-            disp  = (part.get("Content-Disposition") or "").lower()
-            if ctype == "text/html" and "attachment" not in disp:
-                try:
-                    html = part.get_content()
-                except:
-                    try:
-                        html = part.get_payload(decode=True).decode(part.get_content_charset() or "utf-8", errors="ignore")
-                    except:
-                        pass
-            elif ctype == "text/plain" and "attachment" not in disp:
-                try:
-                    text = part.get_content()
-                except:
-                    try:
-                        text = part.get_payload(decode=True).decode(part.get_content_charset() or "utf-8", errors="ignore")
-                    except:
-                        pass
-    else:
-        ctype = msg.get_content_type()
-        if ctype == "text/html":
-            try:
-                html = msg.get_content()
-            except:
-                try:
-                    html = msg.get_payload(decode=True).decode(msg.get_content_charset() or "utf-8", errors="ignore")
-                except:
-                    pass
+    atts = []
+    multipart = msg.is_multipart()
+    if not multipart:
+        if msg.get_content_type() == "text/html":
+            html = _part_text(msg)
         else:
-            try:
-                text = msg.get_content()
-            except:
-                try:
-                    text = msg.get_payload(decode=True).decode(msg.get_content_charset() or "utf-8", errors="ignore")
-                except:
-                    pass
-    return html, text
-
-def add_attachments(mail, msg, tmpdir):
-    """Save each attachment to a temp file and add via Outlook Attachments.Add."""
-    count = 0
+            text = _part_text(msg)
     for part in msg.walk():
-        disp = (part.get("Content-Disposition") or "").lower()
-        if "attachment" in disp or (part.get_filename() and part.get_content_maintype() != "text"):
+        ctype = part.get_content_type()
+        disp  = (part.get("Content-Disposition") or "").lower()
+        if multipart and ctype in ("text/html", "text/plain") and "attachment" not in disp:
+            body = _part_text(part)
+            if body is not None:
+                if ctype == "text/html":
+                    html = body
+                else:
+                    text = body
+        elif _is_attachment(part, disp):
             payload = part.get_payload(decode=True)
             if payload is None:
                 continue
             fn = part.get_filename()
             if not fn:
-                ext = mimetypes.guess_extension(part.get_content_type() or "") or ".bin"
-                fn = f"attachment{count+1}{ext}"
-            p = os.path.join(tmpdir, f"att_{time.time_ns()}_{fn}")
-            try:
-                with open(p, "wb") as f:
-                    f.write(payload)
-                a = mail.Attachments.Add(p)
-                cid = part.get("Content-ID")
-                if cid:
-                    cid = cid.strip("<>")
-                    try:
-                        a.PropertyAccessor.SetProperty(PR_ATTACH_CONTENT_ID, cid)
-                        a.PropertyAccessor.SetProperty(PR_ATTACH_FLAGS, 0)
-                    except Exception:
-                        pass
-                count += 1
-            except Exception:
-                pass
-            finally:
-                try:
-                    os.remove(p)
-                except Exception:
-                    pass
+                ext = mimetypes.guess_extension(ctype or "") or ".bin"
+                fn = f"attachment{len(atts)+1}{ext}"
+            cid = part.get("Content-ID")
+            atts.append((str(fn), payload, str(cid).strip("<>") if cid else None))
+    # Keep a Content-ID only if the HTML body actually references it (cid:...);
+    # other attachments are plain files and skip the CID property writes
+    if atts:
+        referenced = set(CID_REF_RE.findall(html)) if html else ()
+        atts = [(fn, payload, cid if cid in referenced else None) for fn, payload, cid in atts]
+    return html, text, atts
+
+class TmpFilePool:
+    """
+    A fixed set of reusable temp paths (tmpdir/slot_0.bin ... slot_N-1.bin),
+    handed out round-robin. Outlook copies the file content during
+    Attachments.Add, so a slot can be truncated and rewritten for the next
+    attachment instead of creating and unlinking a new file each time.
+    """
+    def __init__(self, tmpdir, size=16):
+        self.tmpdir = tmpdir
+        os.makedirs(tmpdir, exist_ok=True)
+        self.paths = [os.path.join(tmpdir, f"slot_{i}.bin") for i in range(size)]
+        self.next = 0
+
+    def acquire(self):
+        p = self.paths[self.next]
+        self.next = (self.next + 1) % len(self.paths)
+        return p
+
+    def cleanup(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+_NOT_83 = re.compile(r'[^A-Za-z0-9!#$%&\'()\-@^_`{}~]')
+
+def short_filename(fn):
+    """8.3 form of an attachment name for PR_ATTACH_FILENAME (e.g. "Quarterly report.pdf" → "QUARTERL.PDF")."""
+    stem, ext = os.path.splitext(fn)
+    stem = _NOT_83.sub('', stem)[:8] or 'ATTACH'
+    ext = _NOT_83.sub('', ext)[:3]
+    return (stem + ('.' + ext if ext else '')).upper()
+
+def add_attachments(mail, attachments, pool):
+    """Write each pre-extracted attachment to a pooled temp file and add via Outlook Attachments.Add."""
+    count = 0
+    for fn, payload, cid in attachments:
+        p = pool.acquire()
+        try:
+            with open(p, "wb") as f:
+                f.write(payload)
+            a = mail.Attachments.Add(p, 1, DisplayName=fn)  # 1 = olByValue; Position keeps its default
+            # Outlook derives the names and extension from the slot path
+            # (slot_N.bin / SLOT_N.BIN); restore the attachment's own ones
+            # (an empty extension is written too, so no ".bin" is left behind)
+            tags = [PR_ATTACH_LONG_FILENAME_W, PR_ATTACH_FILENAME_W, PR_ATTACH_EXTENSION_W]
+            values = [fn, short_filename(fn), os.path.splitext(fn)[1]]
+            if cid:
+                tags += [PR_ATTACH_CONTENT_ID, PR_ATTACH_FLAGS]
+                values += [cid, 0]
+            set_props(a.PropertyAccessor, tags, values)
+            a = None  # drop the proxy now rather than at the next GC
+            count += 1
+        except Exception:
+            pass
     return count
 
 def build_headers_text(raw_bytes):
-    """Extract raw header block (up to the first blank line) for PR_TRANSPORT_MESSAGE_HEADERS."""
+    """
+    Extract raw header block (up to the first blank line) for PR_TRANSPORT_MESSAGE_HEADERS.
+    Return (text, is_ascii); ASCII-only headers can go into the narrower _A property.
+    """
     try:
-        end = raw_bytes.find(b"\n\n")
-        if end == -1:
-            end = min(len(raw_bytes), 1024 * 128)
+        limit = min(len(raw_bytes), 1024 * 128)
+        ends = [e for e in (raw_bytes.find(b"\r\n\r\n", 0, limit), raw_bytes.find(b"\n\n", 0, limit)) if e != -1]
+        end = min(ends) if ends else limit
         hdr = raw_bytes[:end]
-        return hdr.decode("utf-8", errors="ignore")
+        return hdr.decode("utf-8", errors="ignore"), hdr.isascii()
     except Exception:
-        return ""
+        return "", True
 
-def create_mail_in_dest(dest_folder, msg, raw_headers_text):
+# Parsed once; unparseable files get a (shallow) copy of this stub message
+_FALLBACK_MSG = BytesParser(policy=policy.default).parsebytes(b"Subject: (no subject)\r\n\r\n")
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+
+def parse_mapped(raw, step=1 << 20):
     """
-    Create MailItem directly in the target PST folder (avoids default Drafts).
-    Return unsent MailItem (not submitted), already associated with `dest_folder`.
+    Parse a bytes-like (e.g. mmap) by feeding it to the parser in slices.
+    BytesParser.parsebytes needs a real bytes object and then decodes all of
+    it to str at once; feeding slices avoids both whole-message copies.
     """
-    mail = dest_folder.Items.Add(0)  # 0 = olMailItem
-    pa   = mail.PropertyAccessor
+    fp = BytesFeedParser(policy=policy.default)
+    for i in range(0, len(raw), step):
+        fp.feed(raw[i:i + step])
+    return fp.close()
 
-    # Raw headers first (helps with PR_TRANSPORT_MESSAGE_HEADERS)
-    if raw_headers_text:
-        if not set_prop(pa, PR_TRANSPORT_MESSAGE_HEADERS_W, raw_headers_text):
-            set_prop(pa, PR_TRANSPORT_MESSAGE_HEADERS_A, raw_headers_text)
-
-    # Basic fields
-    mail.Subject = msg.get("Subject", "") or ""
-    mail.To  = addresses_to_str(msg.get("To", ""))
-    mail.CC  = addresses_to_str(msg.get("Cc", ""))
-    mail.BCC = addresses_to_str(msg.get("Bcc", ""))
-
-    # Sender metadata (improves fidelity in Outlook item inspector)
-    from_list = getaddresses([msg.get("From", "")])
-    if from_list:
-        name, addr = (from_list[0][0] or ""), (from_list[0][1] or "")
-        set_prop(pa, PR_SENDER_NAME, name or addr or "")
-        set_prop(pa, PR_SENDER_EMAIL_ADDRESS, addr or "")
-        set_prop(pa, PR_SENDER_ADDRTYPE, "SMTP")
-        set_prop(pa, PR_SENT_REPRESENTING_NAME, name or addr or "")
-        set_prop(pa, PR_SENT_REPRESENTING_EMAIL, addr or "")
-
-    mid = msg.get("Message-ID")
-    if mid:
-        set_prop(pa, PR_INTERNET_MESSAGE_ID, mid)
-
-    # Dates
-    sent_dt = None
-    if msg.get("Date"):
+def parse_date_year(msg):
+    """
+    Return (sent_dt, year) from the Date header, fetched once.
+    policy.default already parsed the header into a DateHeader, so reuse its
+    .datetime rather than tokenizing the string again with parsedate_to_datetime.
+    If the date is unparseable, the year is still pulled out with YEAR_RE so
+    the message gets routed to its year's PST instead of 1970.
+    """
+    try:
+        hdr = msg.get("Date")
+    except Exception:
+        return None, 1970
+    if not hdr:
+        return None, 1970
+    sent_dt = getattr(hdr, "datetime", None)
+    if sent_dt is None:
         try:
-            sent_dt = parsedate_to_datetime(msg.get("Date"))
+            sent_dt = parsedate_to_datetime(str(hdr))
         except Exception:
             pass
-    if sent_dt:
+    if sent_dt is not None:
+        return sent_dt, sent_dt.year
+    m = YEAR_RE.search(str(hdr))
+    return None, int(m.group(0)) if m else 1970
+
+def _parse_one(path):
+    """
+    Read and parse one .eml into a plain, picklable dict (no COM objects).
+    Runs inside the worker processes; the main thread only drives Outlook.
+    On read/parse failure returns {"path": ..., "error": "..."}.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap instead of f.read(): pages come from the OS cache on demand
+            raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    except Exception as e:
+        return {"path": path, "error": f"Could not read {path}: {e}"}
+
+    try:
         try:
-            mail.SentOn = sent_dt
+            msg = parse_mapped(raw)
         except Exception:
-            pass
-        set_prop(pa, PR_MESSAGE_DELIVERY_TIME, sent_dt)
-        set_prop(pa, PR_CLIENT_SUBMIT_TIME, sent_dt)
-
-    # Body
-    html, text = pick_body(msg)
-    if html:
-        mail.HTMLBody = html
-    elif text:
-        mail.Body = text
-    else:
-        mail.Body = ""
+            # Minimal fallback if parsing fails
+            msg = copy.copy(_FALLBACK_MSG)
+
+        from_list = getaddresses([msg.get("From", "")])
+        from_name, from_addr = "", ""
+        if from_list:
+            from_name, from_addr = (from_list[0][0] or ""), (from_list[0][1] or "")
+
+        sent_dt, year = parse_date_year(msg)
+
+        html, text, attachments = walk_mime_once(msg)
+        headers_text, headers_ascii = build_headers_text(raw)
+        mid = msg.get("Message-ID")
+        rec = {
+            "path": path,
+            "subject": str(msg.get("Subject", "") or ""),
+            "to": addresses_to_str(msg.get("To", "")),
+            "cc": addresses_to_str(msg.get("Cc", "")),
+            "bcc": addresses_to_str(msg.get("Bcc", "")),
+            "from_name": from_name,
+            "from_addr": from_addr,
+            "message_id": str(mid) if mid else None,
+            "sent_dt": sent_dt,
+            "html": html,
+            "text": text,
+            "headers_text": headers_text,
+            "headers_ascii": headers_ascii,
+            "attachments": attachments,
+            "year": year,
+            "size": size,
+        }
+        rec["prop_tags"], rec["prop_values"] = mail_props(rec)
+        return rec
+    except Exception as e:
+        return {"path": path, "error": f"Could not parse {path}: {e}"}
+    finally:
+        if size:
+            raw.close()
+
+_HEADER_PARSER = BytesHeaderParser(policy=policy.default)
+
+def scan_year(path, limit=64 * 1024):
+    """Year of one .eml from its header block only (for --parallel-years bucketing)."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(limit)
+        return parse_date_year(_HEADER_PARSER.parsebytes(head))[1]
+    except Exception:
+        return 1970
+
+def pool_workers(requested):
+    """
+    Process count for a ProcessPoolExecutor: `requested`, else the CPU count.
+    Windows caps the pool at 61 processes (ValueError above that).
+    """
+    n = requested or os.cpu_count() or 1
+    return min(n, 61) if sys.platform == "win32" else n
+
+def iter_parsed(executor, files, chunksize=32, window=1024, workers=1):
+    """
+    Yield _parse_one() results for (path, size) `files` in input order. Paths
+    are mapped in windows of at most `window` files and PARSE_WINDOW_BYTES of
+    .eml input, and at most two windows are in flight, so parsed bodies and
+    attachments cannot pile up in memory while the (slower) Outlook side
+    catches up. A file larger than the byte budget gets a window of its own.
+    """
+    ahead = None
+    i, n = 0, len(files)
+    while i < n:
+        j, size = i, 0
+        while j < n and j - i < window and (j == i or size + files[j][1] <= PARSE_WINDOW_BYTES):
+            size += files[j][1]
+            j += 1
+        paths = [p for p, _ in files[i:j]]
+        # Small (byte-bounded) windows still get spread over every worker
+        cs = max(1, min(chunksize, -(-len(paths) // workers)))
+        results = executor.map(_parse_one, paths, chunksize=cs)
+        if ahead is not None:
+            yield from ahead
+        ahead = results
+        i = j
+    if ahead is not None:
+        yield from ahead
+
+def mail_props(rec):
+    """
+    Build the (tags, values) lists for the batched SetProperties call of a
+    parsed record, skipping empty values. Runs in the parse worker so the
+    Outlook thread only forwards the two lists.
+    """
+    name, addr = rec["from_name"], rec["from_addr"]
+    sent_dt = rec["sent_dt"]
+    # Body is written as a raw property too (HTML if available, else text),
+    # skipping the MailItem.HTMLBody/Body parsing and conversion layer
+    html, text = rec["html"], rec["text"]
+    body_tag, body = (PR_BODY_HTML_W, html) if html else (PR_BODY_W, text)
+    # ASCII-only headers (the common case) use the 8-bit property: half the bytes of UTF-16
+    headers_tag = PR_TRANSPORT_MESSAGE_HEADERS_A if rec["headers_ascii"] else PR_TRANSPORT_MESSAGE_HEADERS_W
+    props = (
+        (headers_tag,                    rec["headers_text"]),  # raw headers first
+        (PR_SUBJECT_W,                   rec["subject"]),
+        (PR_INTERNET_MESSAGE_ID,         rec["message_id"]),
+        (PR_SENDER_NAME,                 name or addr),
+        (PR_SENDER_EMAIL_ADDRESS,        addr),
+        (PR_SENDER_ADDRTYPE,             "SMTP" if addr else None),
+        (PR_SENT_REPRESENTING_NAME,      name or addr),
+        (PR_SENT_REPRESENTING_EMAIL,     addr),
+        (PR_MESSAGE_DELIVERY_TIME,       sent_dt),
+        (PR_CLIENT_SUBMIT_TIME,          sent_dt),  # == MailItem.SentOn
+        (body_tag,                       body),
+    )
+    tags, values = [], []
+    for t, v in props:
+        if v:
+            tags.append(t)
+            values.append(v)
+    return tags, values
+
+def create_mail_in_dest(dest_folder, rec):
+    """
+    Create MailItem directly in the target PST folder (avoids default Drafts).
+    `rec` is a parsed record from _parse_one().
+    Return unsent MailItem (not submitted), already associated with `dest_folder`.
+    """
+    mail = dest_folder.Items.Add(OL_MAIL_ITEM)
+    pa   = mail.PropertyAccessor
+
+    # All scalar properties go out in one batched SetProperties call
+    # (one COM round-trip instead of one per property); the tag/value lists
+    # were already assembled by the parse worker (mail_props).
+    raw_headers_text = rec["headers_text"]
+    html, text = rec["html"], rec["text"]
+    body_tag = PR_BODY_HTML_W if html else PR_BODY_W
+    failed = set_props(pa, rec["prop_tags"], rec["prop_values"])
+    if PR_TRANSPORT_MESSAGE_HEADERS_W in failed:
+        set_prop(pa, PR_TRANSPORT_MESSAGE_HEADERS_A, raw_headers_text)
+    if body_tag in failed:
+        # Store refused the raw body property: go through the object model
+        if html:
+            mail.HTMLBody = html
+        else:
+            mail.Body = text
+
+    # Recipients stay on the object model: PR_DISPLAY_TO/CC/BCC are computed
+    # from the recipient table, so they cannot be written as plain properties.
+    if rec["to"]:
+        mail.To  = rec["to"]
+    if rec["cc"]:
+        mail.CC  = rec["cc"]
+    if rec["bcc"]:
+        mail.BCC = rec["bcc"]
 
     return mail
 
-def ensure_outlook_with_logon():
-    """Start Outlook.Application and log on to the default MAPI profile."""
-    app = win32.Dispatch("Outlook.Application")
+def save_item(item, dest, path):
+    """Save a finished MailItem, making sure it ends up in `dest`. Return True on success."""
+    try:
+        item.Save()
+
+        # Safety: ensure the item actually resides in the target folder
+        try:
+            if item.Parent and item.Parent.EntryID != dest.EntryID:
+                item = item.Move(dest)
+                item.Save()
+        except Exception:
+            pass
+        return True
+    except Exception as e:
+        print(f"\n[WARN] Failed to save item from {path}: {e}")
+        return False
+
+def _marshal(obj):
+    """Marshal a COM object for use on another apartment (thread)."""
+    return pythoncom.CoMarshalInterThreadInterfaceInStream(pythoncom.IID_IDispatch, obj._oleobj_)
+
+def _unmarshal(stream):
+    return win32.Dispatch(pythoncom.CoGetInterfaceAndReleaseStream(stream, pythoncom.IID_IDispatch))
+
+class SaveWriter:
+    """
+    Single background thread that runs save_item() for finished MailItems, so
+    the main thread can build message N+1 while MAPI flushes message N.
+    Items cross apartments as marshalled streams; destination folders are sent
+    once per key and unmarshalled on the writer. The bounded queue provides
+    backpressure; drain() before detaching a PST.
+    """
+    def __init__(self, maxsize=4):
+        self.q = queue.Queue(maxsize=maxsize)
+        self.sent_dests = set()
+        self.thread = threading.Thread(target=self._run, name="pst-save", daemon=True)
+        self.thread.start()
+
+    def submit(self, item, dest_key, dest, path):
+        item_stream = _marshal(item)
+        dest_stream = None if dest_key in self.sent_dests else _marshal(dest)
+        self.q.put(("save", item_stream, dest_key, dest_stream, path))
+        # Only once the folder stream is actually queued may later items skip it
+        self.sent_dests.add(dest_key)
+
+    def drain(self):
+        """Wait until every queued item is saved and drop the writer's folder references."""
+        self.q.put(("reset",))
+        self.q.join()
+        self.sent_dests.clear()
+
+    def close(self):
+        self.drain()
+        self.q.put(("stop",))
+        self.thread.join()
+
+    def _run(self):
+        pythoncom.CoInitialize()
+        dests = {}
+        try:
+            while True:
+                op = self.q.get()
+                try:
+                    if op[0] == "stop":
+                        return
+                    if op[0] == "reset":
+                        dests.clear()
+                        continue
+                    _, item_stream, dest_key, dest_stream, path = op
+                    # Any failure costs this one item, never the thread: a dead
+                    # writer would leave the main thread blocked on q.put()/join()
+                    try:
+                        if dest_stream is not None:
+                            dests[dest_key] = _unmarshal(dest_stream)
+                        item = _unmarshal(item_stream)
+                        save_item(item, dests[dest_key], path)
+                    except Exception as e:
+                        print(f"\n[WARN] Failed to save item from {path}: {e}")
+                    item = None
+                finally:
+                    self.q.task_done()
+        finally:
+            dests.clear()
+            pythoncom.CoUninitialize()
+
+def ensure_outlook_with_logon(new_instance=False):
+    """
+    Start Outlook.Application and log on to the default MAPI profile.
+    Prefer makepy early binding (DISPIDs cached at generation time, so no
+    GetIDsOfNames per access; calls still go through IDispatch::Invoke);
+    fall back to late-bound Dispatch if the typelib wrappers cannot be built.
+    new_instance=True asks for a separate server via DispatchEx (year shards).
+    """
+    global OL_MAIL_ITEM
+    dispatch = win32.DispatchEx if new_instance else win32.Dispatch
+    try:
+        win32.gencache.EnsureModule(*OUTLOOK_TYPELIB)
+        app = win32.gencache.EnsureDispatch(dispatch("Outlook.Application") if new_instance else "Outlook.Application")
+        OL_MAIL_ITEM = win32.constants.olMailItem
+    except Exception:
+        app = dispatch("Outlook.Application")
     ns  = app.GetNamespace("MAPI")
     ns.Logon("", "", False, True)  # default profile (no UI)
     return app, ns
@@ -260,25 +573,86 @@ def ensure_outlook_with_logon():
 def normcasepath(p): 
     return os.path.normcase(os.path.normpath(p))
 
-def find_store_by_path(ns, pst_path):
-    """Return an Outlook Store matched by FilePath, else None."""
-    target = normcasepath(pst_path)
-    for store in ns.Stores:
+# normcased PST path -> Store for the PSTs attached by this run
+STORE_BY_PATH = {}
+
+def scan_stores(ns, target):
+    """Linear search of ns.Stores for normcased path `target`, newest first."""
+    stores = ns.Stores
+    try:
+        n = stores.Count
+    except Exception:
+        n = None
+    if n is None:
+        candidates = list(stores)[::-1]
+    else:
+        candidates = range(n, 0, -1)  # a just-attached store is usually the last one
+    for c in candidates:
         try:
-            current = normcasepath(store.FilePath)
-            if current == target:
+            store = stores.Item(c) if n is not None else c
+            if normcasepath(store.FilePath) == target:
                 return store
         except Exception:
             pass
     return None
 
+def find_store_by_path(ns, pst_path):
+    """Return an Outlook Store matched by FilePath, else None (STORE_BY_PATH first, then a scan)."""
+    target = normcasepath(pst_path)
+    store = STORE_BY_PATH.get(target)
+    if store is None:
+        store = scan_stores(ns, target)
+        if store is not None:
+            STORE_BY_PATH[target] = store
+    return store
+
+def detach_pst(ns, root, pst_path):
+    """Remove a PST from the profile and forget its cached Store."""
+    STORE_BY_PATH.pop(normcasepath(pst_path), None)
+    ns.RemoveStore(root)
+
+def attach_pst(ns, pst_path, timeout=5.0):
+    """
+    Attach the PST at pst_path (Outlook creates it if missing), keeping any
+    existing content; return (store, root_folder, actual_path).
+    Polls ns.Stores with exponential backoff (10 ms → 250 ms) until it shows up.
+    """
+    actual = pst_path
+    try:
+        ns.AddStoreEx(actual, 2)  # 2 = Unicode PST
+    except Exception:
+        ns.AddStore(actual)
+
+    # Find the Store that matches the actual path we requested
+    target = normcasepath(actual)
+    delay = 0.01
+    deadline = time.monotonic() + timeout
+    while True:
+        store = scan_stores(ns, target)
+        if store is not None:
+            STORE_BY_PATH[target] = store
+            return store, store.GetRootFolder(), actual
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+
+    # Fallback: if Outlook created the PST in a default location, return the last added
+    last = None
+    for s in ns.Stores:
+        last = s
+    if last:
+        STORE_BY_PATH[normcasepath(last.FilePath)] = last
+        return last, last.GetRootFolder(), last.FilePath
+
+    raise RuntimeError(f"Failed to create/attach PST: {pst_path}")
+
 def create_or_attach_pst(ns, desired_path):
     """
-    Create and attach a PST at desired_path; return (store, root_folder, actual_path).
+    Create and attach a fresh PST at desired_path; return (store, root_folder, actual_path).
     Outlook sometimes creates PST elsewhere (e.g., "Outlook Files"); we detect that
     and return the actual path.
     """
-    import time as _time
     desired_path = os.path.normpath(desired_path)
     out_dir = os.path.dirname(desired_path)
     if out_dir:
@@ -288,7 +662,7 @@ def create_or_attach_pst(ns, desired_path):
     exist = find_store_by_path(ns, desired_path)
     if exist:
         try:
-            ns.RemoveStore(exist.GetRootFolder())
+            detach_pst(ns, exist.GetRootFolder(), desired_path)
         except Exception:
             pass
     if os.path.exists(desired_path):
@@ -297,30 +671,17 @@ def create_or_attach_pst(ns, desired_path):
         except Exception:
             pass
 
-    actual = desired_path
-    try:
-        ns.AddStoreEx(actual, 2)  # 2 = Unicode PST
-    except Exception:
-        ns.AddStore(actual)
-
-    # Find the Store that matches the actual path we requested
-    for _ in range(20):
-        for store in ns.Stores:
-            try:
-                if normcasepath(store.FilePath) == normcasepath(actual):
-                    return store, store.GetRootFolder(), actual
-            except Exception:
-                pass
-        _time.sleep(0.25)
-
-    # Fallback: if Outlook created the PST in a default location, return the last added
-    last = None
-    for s in ns.Stores:
-        last = s
-    if last:
-        return last, last.GetRootFolder(), last.FilePath
+    return attach_pst(ns, desired_path)
 
-    raise RuntimeError(f"Failed to create/attach PST: {desired_path}")
+def ensure_folder_path(root, path):
+    """Return the folder at `path` ("A/B/C") under `root`, creating missing levels."""
+    folder = root
+    for name in [p for p in path.split("/") if p]:
+        try:
+            folder = folder.Folders.Item(name)
+        except Exception:
+            folder = folder.Folders.Add(name)
+    return folder
 
 class PstRouter:
     """
@@ -340,6 +701,58 @@ class PstRouter:
         self.year = {}
         self.target_bytes = None
         self.used_stores = []
+        self.folder_cache = {}  # (pst_path, folder_path) -> MAPIFolder
+        self.folder_ids = {}    # (pst_path, folder_path) -> EntryID; survives re-attach
+
+    def get_folder(self, pst_path, root, folder_path):
+        """
+        Return (and cache) the destination folder `folder_path` inside the PST at `pst_path`.
+        After a re-attach the folder is reopened by EntryID (GetFolderFromID, an
+        index lookup) instead of walking Folders.Item by name again.
+        """
+        key = (pst_path, folder_path)
+        folder = self.folder_cache.get(key)
+        if folder is None:
+            entry_id = self.folder_ids.get(key)
+            if entry_id:
+                try:
+                    folder = self.ns.GetFolderFromID(entry_id, root.StoreID)
+                except Exception:
+                    folder = None
+            if folder is None:
+                folder = ensure_folder_path(root, folder_path)
+                try:
+                    self.folder_ids[key] = folder.EntryID
+                except Exception:
+                    pass
+            self.folder_cache[key] = folder
+        return folder
+
+    def forget_folders(self, pst_path, keep_ids=False):
+        """
+        Drop cached folders of a PST that was (re)attached; its folder objects are stale.
+        EntryIDs remain valid across a plain re-attach (keep_ids=True), not for a new file.
+        """
+        for key in [k for k in self.folder_cache if k[0] == pst_path]:
+            del self.folder_cache[key]
+        if not keep_ids:
+            for key in [k for k in self.folder_ids if k[0] == pst_path]:
+                del self.folder_ids[key]
+
+    def reattach(self, pst_path):
+        """
+        Detach and re-attach an open PST (so Explorer shows its real size),
+        keeping its content and updating the router's store/root for it.
+        Return (store, root, path).
+        """
+        entries = [self.cur] + list(self.year.values())
+        entry = next(e for e in entries if e["path"] == pst_path)
+        self.forget_folders(pst_path, keep_ids=True)
+        detach_pst(self.ns, entry["root"], pst_path)
+        store, root, actual = attach_pst(self.ns, pst_path)
+        entry.update({"store": store, "root": root, "path": actual})
+        self.used_stores.append(store)
+        return store, root, actual
 
     def set_total_bytes(self, total_bytes):
         # For even-split mode: divide total payload by N
@@ -355,6 +768,7 @@ class PstRouter:
         store, root, actual = create_or_attach_pst(self.ns, desired)
         self.cur.update({"store": store, "root": root, "path": actual, "bytes": 0})
         self.used_stores.append(store)
+        self.forget_folders(actual)
         print(f"\nUSING PST: {actual}")
         return store, root, actual
 
@@ -373,6 +787,7 @@ class PstRouter:
             s = {"path": actual, "store": store, "root": root, "bytes": 0, "part": 1}
             self.year[year] = s
             self.used_stores.append(store)
+            self.forget_folders(actual)
             print(f"\nUSING PST ({year}): {actual}")
         elif s["bytes"] + incoming > self.max_bytes:
             s["part"] += 1
@@ -380,6 +795,7 @@ class PstRouter:
             store, root, actual = create_or_attach_pst(self.ns, desired)
             s.update({"path": actual, "store": store, "root": root, "bytes": 0})
             self.used_stores.append(store)
+            self.forget_folders(actual)
             print(f"\nROTATED PST ({year}) → {actual}")
         return s
 
@@ -397,23 +813,127 @@ class PstRouter:
         self.cur["bytes"] += size
         return self.cur["store"], self.cur["root"], self.cur["path"]
 
+def iter_eml_files(root_dir):
+    """
+    Yield (path, size) for every *.eml under root_dir, using an iterative
+    os.scandir walk. DirEntry.stat() is served from the directory listing on
+    Windows, so there is no extra stat call per file.
+    """
+    stack = [root_dir]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            stack.append(e.path)
+                        elif e.name.lower().endswith(".eml"):
+                            try:
+                                sz = e.stat().st_size
+                            except OSError:
+                                sz = 0
+                            yield e.path, sz
+                    except OSError:
+                        pass
+        except OSError as ex:
+            print(f"[WARN] Could not list {d}: {ex}", file=sys.stderr)
+
 def list_eml_files(root_dir):
     """Return [(path, size)], total_bytes – recursively collects *.eml."""
-    files = []
-    total_bytes = 0
-    for base, _, fnames in os.walk(root_dir):
-        for fn in fnames:
-            if fn.lower().endswith(".eml"):
-                p = os.path.join(base, fn)
-                try:
-                    sz = os.path.getsize(p)
-                except OSError:
-                    sz = 0
-                files.append((p, sz))
-                total_bytes += sz
+    files = list(iter_eml_files(root_dir))
+    total_bytes = sum(sz for _, sz in files)
     files.sort()
     return files, total_bytes
 
+def read_file_list(list_path):
+    """Read a "size<TAB>path" list written by run_year_shards(); return (files, total_bytes)."""
+    files = []
+    with open(list_path, "r", encoding="utf-8") as f:
+        for line in f:
+            sz, _, p = line.rstrip("\n").partition("\t")
+            if p:
+                files.append((p, int(sz)))
+    return files, sum(sz for _, sz in files)
+
+def run_year_shards(args, files, out_dir):
+    """
+    --split-by year with --parallel-years N: bucket files by year (header-only
+    pass in a process pool), then run one child import per year, N at a time.
+    Each child gets its own file list and Outlook instance and writes only its
+    year's PSTs; its console output goes to <out-dir>/<base>_<year>.log.
+    Return an exit code (0 if every shard succeeded).
+    """
+    workers = pool_workers(args.workers)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        years = list(ex.map(scan_year, [p for p, _ in files], chunksize=256))
+    buckets = {}
+    for (p, sz), y in zip(files, years):
+        buckets.setdefault(y, []).append((p, sz))
+    if args.year_filter:
+        # Each child gets --year-filter <its year>, which would override the user's
+        buckets = {y: v for y, v in buckets.items() if y == args.year_filter}
+        if not buckets:
+            print(f"No .eml files from {args.year_filter}.")
+            return 0
+
+    jobs = max(1, min(len(buckets), args.parallel_years, (os.cpu_count() or 2) // 2))
+    child_workers = max(1, workers // jobs)
+    list_dir = os.path.join(out_dir, f"_tmp_year_shards_{os.getpid()}")
+    os.makedirs(list_dir, exist_ok=True)
+    print(f"Years: {len(buckets)} | Parallel imports: {jobs}")
+
+    pending = sorted(buckets)
+    running = []
+    failed = []
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                y = pending.pop(0)
+                list_path = os.path.join(list_dir, f"{y}.txt")
+                with open(list_path, "w", encoding="utf-8") as f:
+                    for p, sz in buckets[y]:
+                        f.write(f"{sz}\t{p}\n")
+                cmd = [sys.executable, os.path.abspath(__file__),
+                       "--src", args.src, "--out-dir", out_dir, "--base-name", args.base_name,
+                       "--split-by", "year", "--max-pst-gb", str(args.max_pst_gb),
+                       "--pst-root", args.pst_root, "--flush-every", str(args.flush_every),
+                       "--count-every", str(args.count_every), "--save-queue", str(args.save_queue),
+                       "--workers", str(child_workers), "--year-filter", str(y),
+                       "--file-list", list_path]
+                log = open(os.path.join(out_dir, f"{args.base_name}_{y}.log"), "w", encoding="utf-8")
+                running.append((y, subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT), log))
+                print(f"[{y}] started: {len(buckets[y]):,} files")
+            time.sleep(0.5)
+            for job in list(running):
+                y, proc, log = job
+                rc = proc.poll()
+                if rc is None:
+                    continue
+                log.close()
+                running.remove(job)
+                print(f"[{y}] finished (exit {rc})")
+                if rc:
+                    failed.append(y)
+    finally:
+        for y, proc, log in running:
+            proc.terminate()
+            proc.wait()
+            log.close()
+        shutil.rmtree(list_dir, ignore_errors=True)
+        # All children are gone now; shut down the Outlook they were sharing
+        try:
+            win32.GetActiveObject("Outlook.Application").Quit()
+        except Exception:
+            pass
+
+    if failed:
+        print(f"[WARN] Failed years: {', '.join(map(str, failed))} (see the .log files)", file=sys.stderr)
+        return 1
+    print("\nDone.")
+    print("PST(s) written to:", out_dir)
+    return 0
+
 def main():
     ap = argparse.ArgumentParser(description="Import EML → PST (Outlook/MAPI) with split & progress")
     ap.add_argument("--src", required=True, help="Root folder containing .eml files (recursively)")
@@ -422,22 +942,33 @@ def main():
     ap.add_argument("--split-by", choices=["year"], default=None, help="Split by mail year (one PST per year)")
     ap.add_argument("--splits", type=int, default=None, help="Even-split into N PSTs by total bytes")
     ap.add_argument("--max-pst-gb", type=float, default=15.0, help="Max ~GB per PST before rotating part2/part3...")
-    ap.add_argument("--pst-root", default="Imported (EML)", help="Folder name inside each PST")
+    ap.add_argument("--pst-root", default="Imported (EML)", help="Folder inside each PST (nested: \"A/B\")")
     ap.add_argument("--flush-every", type=int, default=0, help="Detach/reattach PST every N items (0=off)")
     ap.add_argument("--count-every", type=int, default=200, help="Print folder Items.Count every N items (0=off)")
+    ap.add_argument("--save-queue", type=int, default=4, help="Save items on a writer thread with up to N queued (0=save inline)")
+    ap.add_argument("--workers", type=int, default=0, help="Parser worker processes (0=os.cpu_count())")
+    ap.add_argument("--year-filter", type=int, default=None, help="Import only messages from this year")
+    ap.add_argument("--parallel-years", type=int, default=0, help="With --split-by year: run up to N years as parallel imports (0=off)")
+    ap.add_argument("--file-list", default=None, help=argparse.SUPPRESS)  # set by --parallel-years
     args = ap.parse_args()
 
     src = os.path.normpath(args.src)
     out_dir = os.path.normpath(args.out_dir)
     os.makedirs(out_dir, exist_ok=True)
 
-    files, total_bytes = list_eml_files(src)
+    if args.file_list:
+        files, total_bytes = read_file_list(args.file_list)
+    else:
+        files, total_bytes = list_eml_files(src)
     if not files:
         print("No .eml files found.", file=sys.stderr)
         sys.exit(1)
     print(f"EML files: {len(files):,} | Total size: {total_bytes/1e9:,.2f} GB")
 
-    app, ns = ensure_outlook_with_logon()
+    if args.parallel_years and args.split_by == "year" and not args.file_list:
+        sys.exit(run_year_shards(args, files, out_dir))
+
+    app, ns = ensure_outlook_with_logon(new_instance=bool(args.file_list))
 
     router = PstRouter(
         ns=ns,
@@ -449,119 +980,123 @@ def main():
     )
     router.set_total_bytes(total_bytes)
 
-    parser = BytesParser(policy=policy.default)
     start = time.perf_counter()
+    last_print = 0.0
+    total_str = f"{len(files):,}"
     processed = 0
     done_bytes = 0
-    tmpdir = os.path.join(out_dir, "_tmp_eml_to_pst")
-    os.makedirs(tmpdir, exist_ok=True)
+    tmp_pool = TmpFilePool(os.path.join(out_dir, f"_tmp_eml_to_pst_{os.getpid()}"))
     current_pst = None
 
+    # Parsing runs in worker processes; COM stays on this (STA) thread.
+    workers = pool_workers(args.workers)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    chunksize = 32
+    saver = SaveWriter(args.save_queue) if args.save_queue > 0 else None
+
     try:
-        for (path, sz) in files:
-            # Read raw bytes & parse message
-            try:
-                with open(path, "rb") as f:
-                    raw = f.read()
-            except Exception as e:
-                print(f"\n[WARN] Could not read {path}: {e}")
+        parsed = iter_parsed(executor, files, chunksize=chunksize,
+                             window=workers * chunksize * 2, workers=workers)
+        for (path, sz), rec in zip(files, parsed):
+            if rec.get("error"):
+                print(f"\n[WARN] {rec['error']}")
                 continue
-
-            try:
-                msg = parser.parsebytes(raw)
-            except Exception:
-                # Minimal fallback if parsing fails
-                msg = parser.parsebytes(b"Subject: (no subject)\r\n\r\n")
-
-            # Year hint (used when --split-by year)
-            year = 1970
-            try:
-                if msg.get("Date"):
-                    year = parsedate_to_datetime(msg.get("Date")).year
-            except Exception:
-                pass
+            year = rec["year"]
+            if args.year_filter and year != args.year_filter:
+                if not args.file_list:
+                    continue
+                # Year shard: the parent bucketed this file by its first 64 KiB of
+                # headers; keep it in this shard's year rather than dropping it
+                print(f"\n[WARN] {path}: parsed year {year} differs from shard year {args.year_filter}; importing into {args.year_filter}")
+                year = args.year_filter
 
             # Choose PST destination
-            store, root, pst_path = router.route(sz or len(raw), year)
+            store, root, pst_path = router.route(sz or rec["size"], year)
             if pst_path != current_pst:
                 current_pst = pst_path
                 print(f"\nCURRENT PST: {current_pst}")
 
-            # Ensure inner folder exists
-            try:
-                dest = root.Folders.Item(args.pst_root)
-            except Exception:
-                dest = root.Folders.Add(args.pst_root)
+            # Ensure inner folder exists (resolved once per PST, then cached)
+            dest = router.get_folder(pst_path, root, args.pst_root)
 
             # Create item directly in destination folder, add attachments, save
+            # (Save() runs on the writer thread when --save-queue is on)
             try:
-                item = create_mail_in_dest(dest, msg, build_headers_text(raw))
-                add_attachments(item, msg, tmpdir)
-                item.Save()
-
-                # Safety: ensure the item actually resides in the target folder
-                try:
-                    if item.Parent and item.Parent.EntryID != dest.EntryID:
-                        item = item.Move(dest)
-                        item.Save()
-                except Exception:
-                    pass
-
+                item = create_mail_in_dest(dest, rec)
+                add_attachments(item, rec["attachments"], tmp_pool)
+                if saver:
+                    saver.submit(item, (pst_path, args.pst_root), dest, path)
+                else:
+                    save_item(item, dest, path)
             except Exception as e:
                 print(f"\n[WARN] Failed to save item from {path}: {e}")
+            # Release the MailItem proxy eagerly so Outlook can free it
+            item = None
 
             processed += 1
-            done_bytes += (sz or len(raw))
+            done_bytes += (sz or rec["size"])
+
+            if processed % COM_CLEANUP_EVERY == 0:
+                pythoncom.CoFreeUnusedLibraries()
 
             # Periodic live count
             if args.count_every and processed % args.count_every == 0:
                 try:
-                    fresh_dest = root.Folders.Item(args.pst_root)
-                    print(f"\n  Items in '{args.pst_root}': {fresh_dest.Items.Count}")
+                    print(f"\n  Items in '{args.pst_root}': {dest.Items.Count}")
                 except Exception:
                     pass
 
             # Periodic flush: close & reopen the current PST so Explorer shows growth
             if args.flush_every and processed % args.flush_every == 0:
                 try:
-                    ns.RemoveStore(root)
-                    store, root, pst_path = create_or_attach_pst(ns, pst_path)
+                    if saver:
+                        saver.drain()
+                    store, root, pst_path = router.reattach(pst_path)
+                    gc.collect()  # collect dropped COM proxies here, not mid-loop
                     print(f"\n[FLUSH] Re-attached PST: {pst_path}")
                 except Exception as e:
                     print(f"\n[WARN] Periodic flush failed: {e}")
 
-            # Console progress & ETA
-            if processed % 100 == 0 or processed == len(files):
-                pct = (done_bytes / total_bytes) * 100.0
-                elapsed = time.perf_counter() - start
-                rate = done_bytes / max(elapsed, 1e-9)
+            # Console progress & ETA (at most once per second; console writes are slow)
+            now = time.perf_counter()
+            if now - last_print >= 1.0 or processed == len(files):
+                last_print = now
+                pct = (done_bytes / max(total_bytes, 1)) * 100.0
+                rate = done_bytes / max(now - start, 1e-9)
                 eta = (total_bytes - done_bytes) / max(rate, 1e-9)
                 h, m, s = int(eta // 3600), int(eta % 3600 // 60), int(eta % 60)
-                print(f"\r{processed:,}/{len(files):,} ({pct:7.3f}%) | ETA {h:02d}:{m:02d}:{s:02d} | PST: {current_pst}", end="")
+                sys.stdout.write(f"\r{processed:,}/{total_str} ({pct:7.3f}%) | ETA {h:02d}:{m:02d}:{s:02d} | PST: {current_pst}")
+                sys.stdout.flush()
 
         print("\nDone.")
         print(f"Imported items: {processed:,}")
         print("PST(s) written to:", out_dir)
 
     finally:
-        # Final flush: remove all open stores so Outlook writes PSTs to disk
+        executor.shutdown(wait=False, cancel_futures=True)
+        if saver:
+            try:
+                saver.close()
+            except Exception as e:
+                print("\n[WARN] Failed to finish pending saves:", e)
+        tmp_pool.cleanup()
+        # Final flush: remove all stores this run attached (every part, not
+        # just the current one) so Outlook writes PSTs to disk
         try:
-            for s in getattr(router, "year", {}).values():
-                try:
-                    ns.RemoveStore(s["root"])
-                except Exception:
-                    pass
-            if getattr(router, "cur", {}).get("root"):
+            for path, s in list(STORE_BY_PATH.items()):
                 try:
-                    ns.RemoveStore(router.cur["root"])
+                    detach_pst(ns, s.GetRootFolder(), path)
                 except Exception:
                     pass
         except Exception as e:
             print("\n[WARN] Failed to close stores:", e)
-        try:
-            app.Quit()
-        except Exception:
-            pass
+        # Year-shard children usually share one Outlook.exe with their siblings:
+        # leave it running; the parent quits it once every shard has exited
+        if not args.file_list:
+            try:
+                app.Quit()
+            except Exception:
+                pass
 
 if __name__ == "__main__":
     main()
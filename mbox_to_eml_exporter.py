@@ -6,6 +6,8 @@
 #   - --max-per-dir N: cap number of files per directory (0 = no limit)
 #   - --max-dir-bytes GB: cap total size per directory in GB (0 = no limit)
 #   - --sanitize-filenames: make file names safe for Windows/macOS
+#   - --pack tar: append messages to one messages.tar per directory instead of one file each
+#   - --mbox DIR --jobs N: export every .mbox in DIR (one subfolder each), N files at a time
 #   - periodic progress logs and final stats
 #
 # Example:
@@ -15,97 +17,386 @@
 #   python mbox_to_eml_exporter.py --mbox "D:\Mail\inbox.mbox" --out-dir "D:\Export_EML" --layout month --max-per-dir 50000 --max-dir-bytes 9
 #
 import argparse
+import errno
 import hashlib
-import mailbox
+import heapq
+import io
+import mmap
+import operator
 import os
 import re
 import sys
+import tarfile
 import time
-from email.utils import parsedate_to_datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from email.parser import BytesHeaderParser
+from email.utils import parsedate_tz
+
+try:
+    import xxhash  # optional: faster non-cryptographic salt hash
+except ImportError:
+    xxhash = None
+
+FROM_LINE_RE = re.compile(rb'^From ', re.MULTILINE)
+_HP = BytesHeaderParser()
+
+_BAD_FS = re.compile(r'[\\/:*?"<>|]+')
+_WS = re.compile(r'\s+')
 
 def safe_name(s: str) -> str:
     """Return a filesystem-friendly string (safe for Windows/macOS)."""
-    s = re.sub(r'[\\/:*?"<>|]+', '_', s)
-    s = re.sub(r'\s+', ' ', s).strip()
+    s = _BAD_FS.sub('_', s)
+    s = _WS.sub(' ', s).strip()
     return s[:120] or 'msg'
 
+_ENSURED = set()   # directories already created by ensure_dir()
+
 def ensure_dir(path: str) -> str:
-    os.makedirs(path, exist_ok=True)
+    """Create path once; later calls for the same path skip the makedirs syscall."""
+    if path not in _ENSURED:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED.add(path)
     return path
 
-def pick_year_month(msg):
+def parse_headers(head):
+    """Parse a header block copied out by header_bytes() (the body is never decoded)."""
+    return _HP.parsebytes(head, headersonly=True)
+
+def header_dict(headers):
+    """
+    Plain dict of the parsed headers: lower-cased name → first value, as str.
+    Raw 8-bit values (surrogateescaped by the parser) are decoded as UTF-8, so
+    an unencoded UTF-8 Subject keeps its characters.
+    """
+    hdr = {}
+    for k, v in headers.raw_items():
+        k = k.lower()
+        if k not in hdr:
+            if not v.isascii():
+                v = v.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+            hdr[k] = v
+    return hdr
+
+def pick_year_month(hdr):
     """Extract (year, month) from the Date header; default to (1970, 1) if missing/invalid."""
     year = 1970
     month = 1
     try:
-        d = msg.get('Date')
-        if d:
-            dt = parsedate_to_datetime(d)
-            year = dt.year
-            month = dt.month
+        d = hdr.get('date')
+        t = parsedate_tz(d) if d else None
+        # Just the date fields of the tuple: no datetime/tzinfo is built
+        if t and t[0] >= 1 and 1 <= t[1] <= 12:
+            year = t[0]
+            month = t[1]
     except Exception:
         pass
     return year, month
 
-def eml_bytes(msg):
-    """Return raw EML bytes for a mailbox.mboxMessage."""
+_DATE_RE = re.compile(rb'^Date:[ \t]*([^\r\n]*)', re.MULTILINE | re.IGNORECASE)
+_MON_YEAR_RE = re.compile(rb'\b([A-Za-z]{3})[A-Za-z]*\.?[ \t]+(\d{4})\b')
+_MONTHS = {m: i for i, m in enumerate(
+    (b'jan', b'feb', b'mar', b'apr', b'may', b'jun', b'jul', b'aug', b'sep', b'oct', b'nov', b'dec'), 1)}
+
+def fast_year_month(head):
+    """
+    (year, month) read straight from the raw Date header bytes, e.g.
+    "Tue, 1 Jul 2003 10:52:37 +0200" → (2003, 7). None if the header is
+    missing or not in the usual "<day> <Mon> <YYYY>" shape.
+    """
+    d = _DATE_RE.search(head)
+    if not d:
+        return None
+    m = _MON_YEAR_RE.search(d.group(1), 0, 40)
+    if not m:
+        return None
+    month = _MONTHS.get(m.group(1).lower())
+    if month is None:
+        return None
+    return int(m.group(2)), month
+
+def map_file(fd):
+    """Read-only mmap of an open file (b'' for an empty file, which mmap rejects)."""
+    if os.fstat(fd).st_size == 0:
+        return b''
+    mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    # The mbox is read front to back exactly once: ask for aggressive read-ahead
     try:
-        return msg.as_bytes()
-    except Exception:
-        # Fallback: encode string representation if needed
-        return msg.as_string().encode('utf-8', errors='ignore')
-
-def unique_eml_name(idx, msg):
-    """Create a unique file name using Message-ID + index + time-based salt."""
-    mid = (msg.get('Message-ID') or '').encode('utf-8', errors='ignore')
-    h = hashlib.sha1(mid + str(idx).encode() + str(time.time_ns()).encode()).hexdigest()[:12]
-    subj = safe_name(msg.get('Subject') or 'no_subject')
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        pass
+    return mm
+
+RELEASE_EVERY = 256 * 1024 * 1024   # drop already-exported mbox pages in steps of this size
+
+def release_behind(mm, fd, upto):
+    """
+    Drop the pages of mm[0:upto] from this process and (Linux) the page cache, so
+    a long export does not grow RSS or evict other files' cache with mbox bytes.
+    Harmless for views still in use: those pages are just read again.
+    """
+    upto -= upto % mmap.PAGESIZE
+    if upto <= 0 or not isinstance(mm, mmap.mmap):
+        return
+    try:
+        if hasattr(mmap, 'MADV_DONTNEED'):
+            mm.madvise(mmap.MADV_DONTNEED, 0, upto)
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, upto, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+def _message_bounds(mm, start, end):
+    """
+    (start, end) of the message in mm[start:end] without its leading "From "
+    envelope line and without the blank separator line before the next message.
+    """
+    nl = mm.find(b'\n', start, end)
+    if nl == -1:
+        return start, start
+    if end - nl > 4 and mm[end - 4:end] == b'\r\n\r\n':
+        end -= 2
+    elif end - nl > 2 and mm[end - 2:end] == b'\n\n':
+        end -= 1
+    return nl + 1, end
+
+def iter_raw_messages(mm):
+    """
+    Yield (start, end, view) for each message in a mapped mbox, split on lines
+    starting with "From " (same rule as mailbox.mbox). view is mm[start:end] as a
+    memoryview slicing the mapping directly: no per-message copy through the
+    Python heap, no up-front indexing pass.
+    """
+    with memoryview(mm) as mv:
+        start = None   # offset of the current message's "From " line
+        for m in FROM_LINE_RE.finditer(mm):
+            if start is not None:
+                s, e = _message_bounds(mm, start, m.start())
+                yield s, e, mv[s:e]
+            start = m.start()
+        if start is not None:
+            s, e = _message_bounds(mm, start, len(mm))
+            yield s, e, mv[s:e]
+
+def header_bytes(mm, start, end, limit=64 * 1024):
+    """
+    Copy of just the header block of the message at mm[start:end], found within its
+    first `limit` bytes. Only the header pages of the mapping are read; the body is
+    not copied.
+    """
+    stop = min(end, start + limit)
+    lf = mm.find(b'\n\n', start, stop)
+    crlf = mm.find(b'\r\n\r\n', start, stop if lf == -1 else lf + 2)
+    ends = [e for e in (crlf + 2 if crlf != -1 else -1, lf + 1 if lf != -1 else -1) if e != -1]
+    return mm[start:min(ends) if ends else stop]
+
+def unique_eml_name(idx, hdr):
+    """
+    Create a unique file name using Message-ID + the message's index in its mbox
+    (unique within the mbox, and each mbox of a directory run has its own folder).
+    """
+    mid = (hdr.get('message-id') or '').encode('utf-8', errors='ignore')
+    salt = idx.to_bytes(8, 'little')
+    # Uniqueness only, not security: xxh3 if installed, else blake2b (both beat sha1)
+    if xxhash is not None:
+        h = f"{xxhash.xxh3_64_intdigest(mid + salt) & 0xFFFFFFFFFFFF:012x}"
+    else:
+        h = hashlib.blake2b(mid + salt, digest_size=6).hexdigest()
+    subj = safe_name(hdr.get('subject') or 'no_subject')
     return f"{subj}__{h}.eml"
 
-def fits_limits(count_in_dir, bytes_in_dir, max_per_dir, max_dir_bytes):
+_FADV_DONTNEED = getattr(os, 'POSIX_FADV_DONTNEED', None) if hasattr(os, 'posix_fadvise') else None
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+# In-kernel file-to-file copy, best first; downgraded at runtime if the kernel or
+# filesystem refuses (e.g. EXDEV/ENOSYS/EINVAL), ending at a plain write()
+if hasattr(os, 'copy_file_range'):
+    _KERNEL_COPY = 'copy_file_range'
+elif hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+    _KERNEL_COPY = 'sendfile'
+else:
+    _KERNEL_COPY = None
+
+# errnos meaning "this copy method is not supported here", not a real I/O error
+_COPY_UNSUPPORTED = {e for e in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                 getattr(errno, 'EOPNOTSUPP', None), getattr(errno, 'ENOTSUP', None)) if e}
+
+def _copy_range(src_fd, fd, offset, count):
+    """Copy src_fd[offset:offset+count] to fd's position without a user-space pass; returns bytes copied."""
+    global _KERNEL_COPY
+    done = 0
+    while done < count:
+        method = _KERNEL_COPY
+        if method is None:
+            break
+        try:
+            if method == 'copy_file_range':
+                n = os.copy_file_range(src_fd, fd, count - done, offset_src=offset + done)
+            else:
+                n = os.sendfile(fd, src_fd, offset + done, count - done)
+        except OSError as e:
+            if e.errno not in _COPY_UNSUPPORTED:
+                raise   # e.g. ENOSPC/EIO: a real write failure, not a missing feature
+            # Step down from the method that failed; another writer thread may
+            # already have done so, in which case its choice stands
+            if _KERNEL_COPY == method:
+                _KERNEL_COPY = 'sendfile' if method == 'copy_file_range' and sys.platform.startswith('linux') else None
+            continue
+        if n == 0:
+            break
+        done += n
+    return done
+
+def _write_eml(path, raw, src_fd=None, offset=0):
+    """
+    Write raw (the bytes at src_fd[offset:] when src_fd is given) to a new file:
+    in-kernel copy where available, else straight os.write() of the view
+    (no io.BufferedWriter in between).
+    """
+    fd = os.open(path, _OPEN_FLAGS, 0o644)
+    try:
+        with memoryview(raw) as mv:
+            if src_fd is not None:
+                mv = mv[_copy_range(src_fd, fd, offset, len(mv)):]
+            while mv:
+                n = os.write(fd, mv)
+                mv = mv[n:]
+        if _FADV_DONTNEED is not None:
+            # Written once, read back only by the importer later: don't keep it cached
+            try:
+                os.posix_fadvise(fd, 0, 0, _FADV_DONTNEED)
+            except OSError:
+                pass
+    finally:
+        os.close(fd)
+
+TAR_NAME = 'messages.tar'
+
+def _open_tar(dest_dir):
+    """Append-only tar stream for one destination directory (--pack tar)."""
+    return tarfile.open(os.path.join(dest_dir, TAR_NAME), 'w|', bufsize=1 << 20)
+
+def _add_to_tar(tar, fname, raw, mtime):
+    ti = tarfile.TarInfo(fname)
+    ti.size = len(raw)
+    ti.mtime = mtime
+    ti.mode = 0o644
+    tar.addfile(ti, io.BytesIO(raw))
+
+def _close_tar(tar, dest_dir, label=''):
+    try:
+        tar.close()
+    except Exception as e:
+        print(f"{label}[WARN] Failed to close {os.path.join(dest_dir, TAR_NAME)}: {e}")
+
+def _reap(entry, dir_counts, dir_bytes):
+    """Wait for one queued write; on failure undo its accounting and return 1, else 0."""
+    future, dest_dir, dest_path, size = entry
+    try:
+        future.result()
+        return 0
+    except Exception as e:
+        print(f"[WARN] Failed to save {dest_path}: {e}")
+        dir_counts[dest_dir] -= 1
+        dir_bytes[dest_dir] -= size
+        return 1
+
+def fits_limits(count_in_dir, bytes_in_dir, size, max_per_dir, max_dir_bytes):
+    """True if one more message of `size` bytes fits (an empty dir always takes it)."""
     if max_per_dir and count_in_dir >= max_per_dir:
         return False
-    if max_dir_bytes and bytes_in_dir >= max_dir_bytes:
+    if max_dir_bytes and bytes_in_dir and bytes_in_dir + size > max_dir_bytes:
         return False
     return True
 
-def main():
-    ap = argparse.ArgumentParser(description="Export .mbox → .eml with layout and filters")
-    ap.add_argument('--mbox', required=True, help='Path to the .mbox file')
-    ap.add_argument('--out-dir', required=True, help='Destination directory for .eml files')
-    ap.add_argument('--layout', choices=['year','month','flat'], default='year', help='Directory structure (year/month/flat)')
-    ap.add_argument('--start-year', type=int, default=None, help='Export from this year (inclusive)')
-    ap.add_argument('--end-year', type=int, default=None, help='Export up to this year (inclusive)')
-    ap.add_argument('--max-per-dir', type=int, default=0, help='Max files per directory (0 = no limit)')
-    ap.add_argument('--max-dir-bytes', type=float, default=0.0, help='Max total size per directory in GB (0 = no limit)')
-    ap.add_argument('--sanitize-filenames', action='store_true', help='Sanitize filenames')
-    ap.add_argument('--progress-every', type=int, default=1000, help='Log progress every N messages (0 = disabled)')
-    args = ap.parse_args()
+def list_mbox_files(src_dir):
+    """Sorted *.mbox files directly inside src_dir."""
+    return sorted(e.path for e in os.scandir(src_dir)
+                  if e.is_file() and e.name.lower().endswith('.mbox'))
 
-    mbox_path = os.path.normpath(args.mbox)
-    out_root  = os.path.normpath(args.out_dir)
-    if not os.path.exists(mbox_path):
-        print(f"Error: .mbox file not found: {mbox_path}", file=sys.stderr)
-        sys.exit(1)
-    os.makedirs(out_root, exist_ok=True)
+def mbox_label(path):
+    """Output subfolder name for one .mbox of a directory run."""
+    return safe_name(os.path.splitext(os.path.basename(path))[0])
+
+def mbox_labels(paths):
+    """
+    mbox_label() for each path, made distinct: safe_name() can fold different
+    file names together ("a:b" / "a_b", whitespace runs, the length cap), and two
+    jobs sharing a subfolder would break the per-dir limits. Repeats get __2, __3, ...
+    (compared case-insensitively, as on Windows).
+    """
+    labels, used = [], set()
+    for p in paths:
+        base = label = mbox_label(p)
+        n = 1
+        while label.lower() in used:
+            n += 1
+            label = f"{base}__{n}"
+        used.add(label.lower())
+        labels.append(label)
+    return labels
+
+def _export_job(job):
+    """export_mbox(*job) → (result, None), or (None, error text) if that file failed."""
+    try:
+        return export_mbox(*job), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
 
+def export_mbox(mbox_path, out_root, args, label=''):
+    """
+    Export one .mbox into out_root. Returns (exported, skipped, dir_counts, dir_bytes);
+    no state is shared with other calls, so several can run in separate processes.
+    """
     max_dir_bytes = int(args.max_dir_bytes * (1024**3)) if args.max_dir_bytes and args.max_dir_bytes > 0 else 0
 
-    print(f"Reading MBOX: {mbox_path}")
-    mb = mailbox.mbox(mbox_path, factory=mailbox.mboxMessage)
-    total = len(mb)
-    print(f"Messages in MBOX: {total:,}")
+    print(f"{label}Reading MBOX: {mbox_path}")
 
     # Directory trackers
     dir_counts = {}   # path → int
     dir_bytes  = {}   # path → int
+    active_part = {}  # base dir → current part number (1 = the base dir itself)
 
     exported = 0
     skipped = 0
     started = time.time()
 
-    for i, msg in enumerate(mb, 1):
-        year, month = pick_year_month(msg)
+    # File writes run on a thread pool; directory choice and accounting stay on
+    # this thread. At most 2×workers writes are in flight (back-pressure).
+    workers = args.workers or 8
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()   # (future, dest_dir, dest_path, size), oldest first
+
+    # --pack tar: entries are appended on this thread, one stream per directory
+    tar_streams = {}    # dest_dir → tarfile.TarFile
+    tar_mtime = int(time.time())
+
+    fd = os.open(mbox_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        mm = map_file(fd)
+    except Exception:
+        os.close(fd)
+        raise
+    release_at = RELEASE_EVERY   # next checkpoint; pages one step behind it get dropped
+    for i, (start, end, raw) in enumerate(iter_raw_messages(mm), 1):
+        if start >= release_at:
+            # Checkpoint from the actual offset (a big message can jump several
+            # steps); lag one step so writes still in flight keep their pages
+            checkpoint = start - start % RELEASE_EVERY
+            release_behind(mm, fd, checkpoint - RELEASE_EVERY)
+            release_at = checkpoint + RELEASE_EVERY
+        # Year first, straight from the header bytes: messages the year filter
+        # drops never get a parsed Message (or any body page copied)
+        head = header_bytes(mm, start, end)
+        hdr = None
+        ym = fast_year_month(head)
+        if ym is None:
+            hdr = header_dict(parse_headers(head))
+            ym = pick_year_month(hdr)
+        year, month = ym
 
         # Year filters
         if args.start_year and year < args.start_year:
@@ -115,58 +406,156 @@ def main():
             skipped += 1
             continue
 
+        if hdr is None:
+            hdr = header_dict(parse_headers(head))
+
         # Destination directory
         if args.layout == 'flat':
-            dest_dir = out_root
+            base_dir = out_root
         elif args.layout == 'year':
-            dest_dir = os.path.join(out_root, f"{year:04d}")
+            base_dir = os.path.join(out_root, f"{year:04d}")
         else:  # 'month'
-            dest_dir = os.path.join(out_root, f"{year:04d}", f"{month:02d}")
-        ensure_dir(dest_dir)
+            base_dir = os.path.join(out_root, f"{year:04d}", f"{month:02d}")
 
-        # Per-dir limits
+        # Per-dir limits: write into the base dir's current part; when this message
+        # would not fit, move on to the next one (e.g., \2007\01__part2, part3, ...).
+        # Earlier parts only ever fill up, so there is nothing to probe.
+        size = end - start
+        part = active_part.get(base_dir, 1)
+        dest_dir = base_dir if part == 1 else f"{base_dir}__part{part}"
         c = dir_counts.get(dest_dir, 0)
         b = dir_bytes.get(dest_dir, 0)
-
-        raw = eml_bytes(msg)
-        size = len(raw)
-
-        if not fits_limits(c, b, args.max_per_dir, max_dir_bytes):
-            # When limits are reached, create incremental subfolders: e.g., \2007\01__part2, part3, ...
-            part = 2
-            base_dir = dest_dir
-            while True:
-                alt = base_dir + f"__part{part}"
-                ensure_dir(alt)
-                c_alt = dir_counts.get(alt, 0)
-                b_alt = dir_bytes.get(alt, 0)
-                if fits_limits(c_alt, b_alt, args.max_per_dir, max_dir_bytes):
-                    dest_dir = alt
-                    c = c_alt
-                    b = b_alt
-                    break
-                part += 1
+        if not fits_limits(c, b, size, args.max_per_dir, max_dir_bytes):
+            # A full part is never written again: finish its tar now rather than
+            # holding a descriptor and buffer per part until the end of the run
+            tar = tar_streams.pop(dest_dir, None)
+            if tar is not None:
+                _close_tar(tar, dest_dir, label)
+            part += 1
+            active_part[base_dir] = part
+            dest_dir = f"{base_dir}__part{part}"
+            c = dir_counts.get(dest_dir, 0)
+            b = dir_bytes.get(dest_dir, 0)
+        ensure_dir(dest_dir)
 
         # File name
-        fname = unique_eml_name(i, msg)
-        if args.sanitize_filenames:
-            fname = safe_name(fname)
+        # unique_eml_name() already sanitizes the subject part
+        fname = unique_eml_name(i, hdr)
         dest_path = os.path.join(dest_dir, fname)
 
-        try:
-            with open(dest_path, 'wb') as f:
-                f.write(raw)
-            dir_counts[dest_dir] = c + 1
-            dir_bytes[dest_dir]  = b + size
-            exported += 1
-        except Exception as e:
-            print(f"[WARN] Failed to save {dest_path}: {e}")
-            skipped += 1
+        if args.pack == 'tar':
+            try:
+                tar = tar_streams.get(dest_dir)
+                if tar is None:
+                    tar = tar_streams[dest_dir] = _open_tar(dest_dir)
+                _add_to_tar(tar, fname, raw, tar_mtime)
+            except Exception as e:
+                print(f"{label}[WARN] Failed to pack {dest_path}: {e}")
+                skipped += 1
+                # A failed addfile() can leave a partial entry in the 'w|' stream:
+                # close what is there (entries before it stay readable) and send
+                # this directory's next messages to a fresh __partN with its own tar
+                tar = tar_streams.pop(dest_dir, None)
+                if tar is not None:
+                    try:
+                        tar.close()
+                    except Exception:
+                        pass
+                    active_part[base_dir] = part + 1
+                continue
+        else:
+            if len(pending) >= 2 * workers:
+                failed = _reap(pending.popleft(), dir_counts, dir_bytes)
+                exported -= failed
+                skipped += failed
+            pending.append((pool.submit(_write_eml, dest_path, raw, fd, start), dest_dir, dest_path, size))
+        dir_counts[dest_dir] = c + 1
+        dir_bytes[dest_dir]  = b + size
+        exported += 1
 
         if args.progress_every and args.progress_every > 0 and i % args.progress_every == 0:
             elapsed = time.time() - started
             rate = exported / elapsed if elapsed > 0 else 0
-            print(f"{i:,}/{total:,} | exported: {exported:,} | skipped: {skipped:,} | {rate:.1f} msg/s")
+            print(f"{label}{i:,} so far | exported: {exported:,} | skipped: {skipped:,} | {rate:.1f} msg/s")
+
+    while pending:
+        failed = _reap(pending.popleft(), dir_counts, dir_bytes)
+        exported -= failed
+        skipped += failed
+    pool.shutdown(wait=True)
+    for dest_dir, tar in tar_streams.items():
+        _close_tar(tar, dest_dir, label)
+
+    # Views into the mapping must be released before it can be closed
+    raw = None
+    if isinstance(mm, mmap.mmap):
+        mm.close()
+    os.close(fd)
+
+    return exported, skipped, dir_counts, dir_bytes
+
+def main():
+    ap = argparse.ArgumentParser(description="Export .mbox → .eml with layout and filters")
+    ap.add_argument('--mbox', required=True, help='Path to the .mbox file, or a directory of .mbox files')
+    ap.add_argument('--out-dir', required=True, help='Destination directory for .eml files')
+    ap.add_argument('--layout', choices=['year','month','flat'], default='year', help='Directory structure (year/month/flat)')
+    ap.add_argument('--start-year', type=int, default=None, help='Export from this year (inclusive)')
+    ap.add_argument('--end-year', type=int, default=None, help='Export up to this year (inclusive)')
+    ap.add_argument('--max-per-dir', type=int, default=0, help='Max files per directory (0 = no limit)')
+    ap.add_argument('--max-dir-bytes', type=float, default=0.0, help='Max total size per directory in GB (0 = no limit)')
+    ap.add_argument('--sanitize-filenames', action='store_true', help='Sanitize filenames (always on; kept for compatibility)')
+    ap.add_argument('--progress-every', type=int, default=1000, help='Log progress every N messages (0 = disabled)')
+    ap.add_argument('--workers', type=int, default=8, help='Writer threads for .eml files (default 8)')
+    ap.add_argument('--pack', choices=['none','tar'], default='none', help='none = one .eml file per message; tar = one messages.tar per directory')
+    ap.add_argument('--jobs', type=int, default=1, help='With a directory of .mbox files: export this many files at once (processes)')
+    args = ap.parse_args()
+
+    mbox_path = os.path.normpath(args.mbox)
+    out_root  = os.path.normpath(args.out_dir)
+    if not os.path.exists(mbox_path):
+        print(f"Error: .mbox file not found: {mbox_path}", file=sys.stderr)
+        sys.exit(1)
+    os.makedirs(out_root, exist_ok=True)
+
+    if os.path.isdir(mbox_path):
+        # One subfolder per source file, so jobs never share a directory and the
+        # per-dir counts/limits each job keeps stay exact; the totals just add up.
+        mbox_files = list_mbox_files(mbox_path)
+        if not mbox_files:
+            print(f"Error: no .mbox files in: {mbox_path}", file=sys.stderr)
+            sys.exit(1)
+        jobs = [(p, os.path.join(out_root, label), args, f"[{label}] ")
+                for p, label in zip(mbox_files, mbox_labels(mbox_files))]
+    else:
+        jobs = [(mbox_path, out_root, args)]
+
+    started = time.time()
+    exported = 0
+    skipped = 0
+    dir_counts = {}
+    dir_bytes  = {}
+    failed = []       # (mbox path, error) for files that could not be exported
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 and len(jobs) > 1 else None
+    try:
+        if executor is None:
+            results = map(_export_job, jobs)
+        else:
+            results = executor.map(_export_job, jobs)
+        for job, (result, error) in zip(jobs, results):
+            if error:
+                print(f"[WARN] Failed to export {job[0]}: {error}")
+                failed.append((job[0], error))
+                continue
+            e, s, counts, sizes = result
+            exported += e
+            skipped += s
+            for k, v in counts.items():
+                dir_counts[k] = dir_counts.get(k, 0) + v
+            for k, v in sizes.items():
+                dir_bytes[k] = dir_bytes.get(k, 0) + v
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
 
     elapsed = time.time() - started
     print("\nDone.")
@@ -174,10 +563,15 @@ def main():
     if exported:
         print(f"Average speed: {exported/elapsed:.1f} msg/s")
         # Top 10 directories by total size
-        top = sorted(dir_bytes.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        top = heapq.nlargest(10, dir_bytes.items(), key=operator.itemgetter(1))
         print("\nTop directories by size:")
         for p, bytes_ in top:
             print(f" - {p} → {bytes_/1e9:.2f} GB, {dir_counts.get(p,0)} files")
+    if failed:
+        print(f"\nFailed .mbox files: {len(failed):,}")
+        for p, error in failed:
+            print(f" - {p}: {error}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()